@@ -1,8 +1,18 @@
 from typing import Tuple, Dict, Any
 import polars as pl
+from polars.exceptions import ComputeError
 import sys
+import atexit
+import contextlib
 from datetime import datetime
+import glob
+import hashlib
 import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from operator import itemgetter
 prod = True
 if prod:
     from .universal_checks import (
@@ -16,7 +26,11 @@ if prod:
         no_negatives_check,
         options_expiry_check,
         options_quantity_check,
-        duplicate_rows_check
+        duplicate_rows_check,
+        Utils,
+        DATETIME_FORMAT,
+        DATETIME_FALLBACK_FORMATS,
+        EXPIRY_FORMAT,
     )
     from .universal_info_checks import (
         concurrent_positions,
@@ -33,7 +47,11 @@ else:
         no_negatives_check,
         options_expiry_check,
         options_quantity_check,
-        duplicate_rows_check
+        duplicate_rows_check,
+        Utils,
+        DATETIME_FORMAT,
+        DATETIME_FALLBACK_FORMATS,
+        EXPIRY_FORMAT,
     )
     from universal_info_checks import (
         concurrent_positions,
@@ -42,127 +60,207 @@ else:
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 
+# Columns the row checks read, in the order their issue headers expect (idx first).
+# no_nulls_check, duplicate_rows_check and the report still get every column of the log
+REQUIRED_COLS = (
+    'idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
+    'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch'
+)
+
+# Parsed once in preprocessing and handed to the checks that need them, instead of re-parsed per check
+PARSED_COLS = ('KeyDT', 'ExitDT', 'ExpiryDT')
+
+# Known trade log dtypes, so the CSV reader skips inference for these columns.
+# Quantity/PositionStatus stay inferred so integer logs keep reporting as ints
+SCHEMA = {
+    "Key": pl.Utf8,
+    "ExitTime": pl.Utf8,
+    "Symbol": pl.Utf8,
+    "EntryPrice": pl.Float64,
+    "ExitPrice": pl.Float64,
+    "Pnl": pl.Float64,
+    "ExitType": pl.Utf8,
+}
+# Part of the parsed-CSV cache key, so caches written under a different SCHEMA are never reused
+SCHEMA_TAG = hashlib.sha1(repr(sorted((k, str(v)) for k, v in SCHEMA.items())).encode()).hexdigest()[:8]
+# Per-user: cached trade logs must be neither readable nor plantable by other local users
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "trade_log_validator",
+)
+
 
 class Logger:
     def __init__(self, algo_name, log_dir: str = "logs"):
-        import os
         self.terminal = sys.stdout
         
         os.makedirs(log_dir, exist_ok=True)
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Taken once per run; the header below reuses it instead of re-reading the clock
+        self.run_ts = datetime.now()
         self.log_file = os.path.join(log_dir, f"validation.log")
-        self.log = open(self.log_file, 'a', encoding='utf-8')
+        # Buffered; flushed on explicit flush()/close() rather than on every write
+        self.log = open(self.log_file, 'a', encoding='utf-8', buffering=65536)
+        atexit.register(self.close)
         
         # Write separator for new run
         self.log.write(f"\n{'='*80}\n")
-        self.log.write(f"Run started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        self.log.write(f"Run started at: {self.run_ts.strftime('%Y-%m-%d %H:%M:%S')}\n")
         self.log.write(f"{'='*80}\n\n")
         self.log.flush()
     
     def write(self, message):
         self.terminal.write(message)
         self.log.write(message)
-        self.log.flush()
     
     def flush(self):
         self.terminal.flush()
         self.log.flush()
     
     def close(self):
+        if self.log.closed:
+            return
+        atexit.unregister(self.close)
         self.log.write(f"\n{'='*80}\n")
         self.log.write(f"Run completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         self.log.write(f"{'='*80}\n")
         self.log.close()
 
 
-def load_df(path: str) -> pl.DataFrame:
-    return pl.read_csv(path)
+def _private_cache_dir() -> bool:
+    # CACHE_DIR is created 0700; an existing one is only trusted (scan_ipc reads whatever is
+    # in it) if it is a real directory owned by this user and closed to everyone else
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        st = os.lstat(CACHE_DIR)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if hasattr(os, "getuid"):
+        return st.st_uid == os.getuid() and not st.st_mode & 0o077
+    return True
+
 
+def load_df(path: str) -> pl.LazyFrame:
+    # Parsed CSVs are cached as Arrow IPC under CACHE_DIR (never next to the user's data),
+    # so re-validating an unchanged file skips CSV tokenization entirely. One cache file per
+    # source: named after its absolute path, keyed on mtime/size and the SCHEMA it was read with
+    if not _private_cache_dir():
+        print(f"Warning: Not caching {path}: {CACHE_DIR} is not a private directory owned by this user")
+        return pl.scan_csv(path, schema_overrides=SCHEMA)
+    source = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    key = f"{os.path.getmtime(path)}_{os.path.getsize(path)}_{SCHEMA_TAG}"
+    cached = os.path.join(CACHE_DIR, f"{source}.{key}.arrow")
+    if not os.path.exists(cached):
+        tmp = None
+        try:
+            # Each writer gets its own 0600 temp file, so concurrent runs on one log never
+            # truncate (or clean up) each other's; os.replace then publishes it atomically
+            fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, prefix=f"{source}.", suffix=".tmp")
+            os.close(fd)
+            pl.scan_csv(path, schema_overrides=SCHEMA).sink_ipc(tmp)
+            os.replace(tmp, cached)
+        except (OSError, ComputeError) as e:
+            if tmp is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp)
+            if isinstance(e, ComputeError):
+                print(f"Warning: Could not parse {path} for caching: {e}")
+            else:
+                print(f"Warning: Could not write parsed cache {cached}: {e}")
+            return pl.scan_csv(path, schema_overrides=SCHEMA)
+        # Older caches of this source are stale now that the file (or SCHEMA) changed
+        for stale in glob.glob(os.path.join(CACHE_DIR, f"{source}.*.arrow")):
+            if stale != cached:
+                with contextlib.suppress(OSError):
+                    os.remove(stale)
+    return pl.scan_ipc(cached, memory_map=True)
 
-def build_and_run(trade_log: str, segment: str, lot_size_file, ORB_URL, ORB_USERNAME, ORB_PASSWORD) -> Tuple[list, Dict[str, Any], Dict[str, Any], pl.DataFrame]:
-    df = load_df(trade_log)
-    lot_size_df = load_df(lot_size_file)
-    # print(lot_size_df)
+
+def _unparsed_timestamps() -> pl.Expr:
+    # Trades with a Key/ExitTime present but not parsed into KeyDT/ExitDT
+    return ((pl.col("Key").is_not_null() & pl.col("KeyDT").is_null())
+            | (pl.col("ExitTime").is_not_null() & pl.col("ExitDT").is_null()))
+
+
+@lru_cache(maxsize=8)
+def _preprocess_trade_log(path: str, mtime: float, size: int, datetime_format: str = DATETIME_FORMAT) -> pl.DataFrame:
+    # mtime/size only key the cache, so re-running on an unchanged log reuses the
+    # preprocessed frame, while an edited file (or another datetime_format) misses and is rebuilt
+    lf = load_df(path)
     # mimic main.py preprocessing
-    df = df.with_row_index("idx")
-    df = df.with_columns(
-        pl.col("Key").alias("KeyEpoch"),
-        pl.col("ExitTime").alias("ExitEpoch"),
-    )
-    
-    
+    lf = lf.with_row_index("idx")
+    # Parse with the algo's layout once; the IST wall times are kept for the market hours
+    # and expiry checks, and the epochs are those times shifted to UTC
+    lf = lf.with_columns([
+        Utils.parse_datetime("Key", (datetime_format,)).alias("KeyDT"),
+        Utils.parse_datetime("ExitTime", (datetime_format,)).alias("ExitDT"),
+        # Option expiry, ex: 21JAN21 from BANKNIFTY21JAN2131000PE
+        pl.col("Symbol").str.slice(5, 7).str.strptime(pl.Date, EXPIRY_FORMAT, strict=False).alias("ExpiryDT"),
+    ])
+
     try:
+        df = lf.collect(engine="streaming")
+    except ComputeError as e:
+        print(f"Warning: Streaming collect failed, falling back to in-memory engine: {e}")
+        df = lf.collect()
+
+    # Logs in another layout: the fallback formats are only tried when the fast path missed values
+    if df.select(_unparsed_timestamps().any()).item():
+        fallbacks = tuple(f for f in (DATETIME_FORMAT,) + DATETIME_FALLBACK_FORMATS if f != datetime_format)
         df = df.with_columns(
-            pl.col("KeyEpoch").str.to_datetime(strict=False).dt.epoch(),
-            pl.col("ExitEpoch").str.to_datetime(strict=False).dt.epoch(),
+            pl.coalesce("KeyDT", Utils.parse_datetime("Key", fallbacks)).alias("KeyDT"),
+            pl.coalesce("ExitDT", Utils.parse_datetime("ExitTime", fallbacks)).alias("ExitDT"),
         )
-    except Exception as e:
-        print(f"Warning: Error converting datetime for KeyEpoch/ExitEpoch: {e}")
-        # Fill NaN values with 0 or handle gracefully
-        df = df.with_columns([
-            pl.col("KeyEpoch").str.to_datetime(strict=False).dt.epoch().fill_null(0),
-            pl.col("ExitEpoch").str.to_datetime(strict=False).dt.epoch().fill_null(0)
-        ])
-    
-    try:
-        df = df.with_columns([
-            (pl.col("KeyEpoch").cast(pl.Int64))
-                .cast(pl.Datetime("us"))
-                .dt.offset_by("-5h30m")
-                .cast(pl.Int64)
-                .alias("KeyEpoch"),
-
-            (pl.col("ExitEpoch").cast(pl.Int64))
-                .cast(pl.Datetime("us"))
-                .dt.offset_by("-5h30m")
-                .cast(pl.Int64)
-                .alias("ExitEpoch")
-        ])
-    except Exception as e:
-        print(f"Warning: Error processing epoch timestamps for KeyEpoch/ExitEpoch: {e}")
-        # Handle NaN values in epoch columns
-        df = df.with_columns([
-            pl.when(pl.col("KeyEpoch").is_nan())
-                .then(0)
-                .otherwise(pl.col("KeyEpoch"))
-                .alias("KeyEpoch"),
-            pl.when(pl.col("ExitEpoch").is_nan())
-                .then(0)
-                .otherwise(pl.col("ExitEpoch"))
-                .alias("ExitEpoch")
-        ])
-    
-    # Additional validation to ensure no NaN values in KeyEpoch/ExitEpoch
-    df = df.with_columns([
-        pl.when(pl.col("KeyEpoch").is_nan())
-            .then(0)
-            .otherwise(pl.col("KeyEpoch"))
-            .alias("KeyEpoch"),
-        pl.when(pl.col("ExitEpoch").is_nan())
-            .then(0)
-            .otherwise(pl.col("ExitEpoch"))
-            .alias("ExitEpoch")
+    # Timestamps no layout parses come through as nulls and their epochs are filled with 0
+    return df.with_columns([
+        pl.col("KeyDT").dt.offset_by("-5h30m").dt.epoch("us").fill_null(0).alias("KeyEpoch"),
+        pl.col("ExitDT").dt.offset_by("-5h30m").dt.epoch("us").fill_null(0).alias("ExitEpoch"),
     ])
 
-    results = []
-
-    results.append(no_nulls_check(df))
-    results.append(non_zero_check(df))
-    results.append(no_fractional_check(df))
-    results.append(exit_after_entry_check(df))
-    results.append(market_hours_check(df))
-    results.append(pnl_check(df))
-    results.append(no_negatives_check(df))
-    results.append(duplicate_rows_check(df))
-    results.append(entry_exit_price_chain_check(df, ORB_URL=ORB_URL, ORB_USERNAME=ORB_USERNAME, ORB_PASSWORD=ORB_PASSWORD))
+
+def build_and_run(trade_log: str, segment: str, lot_size_file, ORB_URL, ORB_USERNAME, ORB_PASSWORD, datetime_format: str = DATETIME_FORMAT) -> Tuple[list, Dict[str, Any], Dict[str, Any], pl.DataFrame]:
+    # Keyed on the absolute path, as load_df is: a relative path reused after a chdir is another file
+    df = _preprocess_trade_log(os.path.abspath(trade_log), os.path.getmtime(trade_log), os.path.getsize(trade_log), datetime_format)
+    # Not silent: these trades get epoch 0, so the time-based checks can't judge them
+    unparsed = df.select(_unparsed_timestamps().sum()).item()
+    if unparsed:
+        print(f"Warning: {unparsed} trade(s) have a Key/ExitTime in an unrecognised layout "
+              f"(expected {datetime_format!r}); their epochs are 0 and time-based checks cannot validate them")
+
+    # Checks get the trade columns only; the parsed ones are passed to the checks that use them
+    parsed = df.select(PARSED_COLS)
+    df = df.drop(PARSED_COLS)
+    # Checks that read a fixed set of columns get just those; no_nulls_check and
+    # duplicate_rows_check look at every column of the log, so they get the full frame
+    narrow = df.select([c for c in REQUIRED_COLS if c in df.columns])
+
+    jobs = [
+        (no_nulls_check, df),
+        (non_zero_check, narrow),
+        (no_fractional_check, narrow),
+        (exit_after_entry_check, narrow),
+        (partial(market_hours_check, parsed=parsed), narrow),
+        (pnl_check, narrow),
+        (no_negatives_check, narrow),
+        (duplicate_rows_check, df),
+        (partial(entry_exit_price_chain_check, ORB_URL=ORB_URL, ORB_USERNAME=ORB_USERNAME, ORB_PASSWORD=ORB_PASSWORD), narrow),
+    ]
     if segment == "OPTIONS":
-        results.append(options_expiry_check(df))
-        results.append(options_quantity_check(df, lot_size_df))
-        
+        jobs.append((partial(options_expiry_check, parsed=parsed), narrow))
+        jobs.append((partial(options_quantity_check, lot_size_df=load_df(lot_size_file).collect()), narrow))
+
+    # Checks only read their frame, so they can run side by side; results keep check order.
+    # The info check is submitted to the same pool so it overlaps with them too
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        info_future = ex.submit(concurrent_positions, narrow)
+        futures = [ex.submit(fn, frame) for fn, frame in jobs]
+        results = [f.result() for f in futures]
+        r = info_future.result()
+
     infos: Dict[str, Any] = {}
     # for fn in (pnl_distribution, trade_duration, concurrent_positions):
-    r = concurrent_positions(df)
     infos[r.name] = r.details
     # print(results)
     
@@ -172,6 +270,11 @@ def build_and_run(trade_log: str, segment: str, lot_size_file, ORB_URL, ORB_USER
 
 
 def print_summary(results, violations, infos, skip_infos=False):
+    # Healthy log with nothing informational to show: one line is enough
+    if all(r.status == "PASS" for r in results) and (skip_infos or not infos):
+        print("All checks PASS")
+        return
+
     # print("=== Validation Summary ===")
     for r in results:
         tag = "PASS" if r.status == "PASS" else ("FAIL" if r.status == "FAIL" else r.status)
@@ -192,19 +295,29 @@ def print_summary(results, violations, infos, skip_infos=False):
                 print(f'{key.upper()}: {val}')
 
 
+def _sink_csv(lf: pl.LazyFrame, output_file: str) -> None:
+    # Streams row chunks to disk, so no report is ever held in memory as a whole CSV;
+    # plans the streaming sink can't run are collected and written instead
+    try:
+        lf.sink_csv(output_file)
+    except ComputeError:
+        lf.collect().write_csv(output_file)
+
+
 def generate_violations_report(trade_log: str = "violations.csv", output_file: str = "violations_report.csv"):
     try:
-        df = pl.read_csv(trade_log)
+        lf = pl.scan_csv(trade_log)
         
-        # exclude_issues = [
-        #     "ConcurrentTradesExceeded",  
-        #     "TradesDuration",            
-        #     "PnLDistribution"            
-        # ]
+        exclude_issues = [
+            "ConcurrentTradesExceeded",  
+            "TradesDuration",            
+            "PnLDistribution"            
+        ]
         
-        df_violations = df.filter(~pl.col("IssueType").is_in(exclude_issues))
+        lf_violations = lf.filter(~pl.col("IssueType").is_in(exclude_issues))
         
-        report_data = df_violations.select([
+        # One projection: Description reads the full IssueType before it is trimmed
+        report_lf = lf_violations.select([
             pl.col("Key"),
             pl.col("ExitTime"),
             pl.col("Symbol"),
@@ -212,27 +325,15 @@ def generate_violations_report(trade_log: str = "violations.csv", output_file: s
             pl.col("ExitPrice"),
             pl.col("Pnl"),
             pl.col("Quantity"),
-            pl.col("IssueType"),
+            pl.col("IssueType").str.split(' ').list.get(0),
             (pl.col("IssueType") + " - Entry: " + pl.col("Key") + ", Exit: " + pl.col("ExitTime")).alias("Description")
         ]).with_row_index("Trade_ID")
         
-        report_df = report_data.select([
-            pl.col("Trade_ID"),
-            pl.col("Key"),
-            pl.col("ExitTime"),
-            pl.col("Symbol"),
-            pl.col("EntryPrice"),
-            pl.col("ExitPrice"),
-            pl.col("Pnl"),
-            pl.col("Quantity"),
-            pl.col("IssueType").str.split(' ').list.get(0),
-            pl.col("Description")
-        ])
-        
-        report_df.write_csv(output_file)
+        # Built lazily so scan, filter and projection run as one plan streamed to disk
+        _sink_csv(report_lf, output_file)
         
-        if len(df_violations) > 0:
-            issue_counts = df_violations.group_by("IssueType").len().sort("len", descending=True)
+        issue_counts = lf_violations.group_by("IssueType").len().sort("len", descending=True).collect()
+        if len(issue_counts) > 0:
             print(f"\n=== Violations Report Generated ===")
             print(f"Output file: {output_file}")
             # print(f"Total violations (excluding info checks): {len(df_violations)}")
@@ -245,7 +346,7 @@ def generate_violations_report(trade_log: str = "violations.csv", output_file: s
             print(f"Total violations (excluding info checks): 0")
             print("No violations found after excluding info check related issues.")
         
-        return report_df
+        return output_file
     except Exception as e:
         print(f"Error generating violations report: {e}")
         return None
@@ -253,9 +354,10 @@ def generate_violations_report(trade_log: str = "violations.csv", output_file: s
 
 def generate_violations_from_checks(results, df_original: pl.DataFrame, algo_name,  output_dir: str = "logs"):
     try:
-        violations_indices = set()
-        violations_issues = {}  # Maps idx to list of issue types
-        violations_severity = {}  # Maps (idx, issue_type) to severity level
+        # Parallel columns of the long (idx, IssueType, IssueLevel) violations frame
+        violation_idxs = []
+        violation_types = []
+        violation_levels = []
         info_check_violations = {}
         errors_count = 0
         warnings_count = 0
@@ -275,65 +377,65 @@ def generate_violations_from_checks(results, df_original: pl.DataFrame, algo_nam
                             if result.issue_severity and issue_type in result.issue_severity:
                                 severity = result.issue_severity[issue_type]
                             
-                            for row_data in rows[1:]:  # Skip header, get data
-                                row_idx = row_data[idx_pos]
-                                if is_info_check:
+                            # Pull the idx column out of every data row in one C-level pass
+                            row_idxs = list(map(itemgetter(idx_pos), rows[1:]))  # Skip header
+                            if is_info_check:
+                                for row_idx in row_idxs:
                                     info_check_violations[row_idx] = f"{result.name}: {issue_type}"
+                            else:
+                                # One entry per (row, issue); a row can carry several issues
+                                violation_idxs.extend(row_idxs)
+                                violation_types.extend([issue_type] * len(row_idxs))
+                                violation_levels.extend([severity] * len(row_idxs))
+                                if severity == "ERROR":
+                                    errors_count += len(row_idxs)
                                 else:
-                                    violations_indices.add(row_idx)
-                                    # Store all issue types for each row (can have multiple)
-                                    if row_idx not in violations_issues:
-                                        violations_issues[row_idx] = []
-                                    violations_issues[row_idx].append(issue_type)
-                                    # Store severity level for this issue
-                                    violations_severity[(row_idx, issue_type)] = severity
-                                    if severity == "ERROR":
-                                        errors_count += 1
-                                    else:
-                                        warnings_count += 1
+                                    warnings_count += len(row_idxs)
         
         if info_check_violations:
             print(f"\n=== Info Check Violations (Console Only) ===")
             for idx, issue_detail in sorted(info_check_violations.items()):
                 print(f"  Row {idx}: {issue_detail}")
         
-        if violations_indices:
-            df_violations = df_original.filter(pl.col("idx").is_in(list(violations_indices)))
-            
-            # Expand rows: duplicate each row for each issue type
-            expanded_rows = []
-            for row in df_violations.iter_rows(named=True):
-                idx = row["idx"]
-                issue_types = violations_issues.get(idx, ["Unknown"])
-                for issue_type in issue_types:
-                    row_copy = dict(row)
-                    row_copy["IssueType"] = issue_type
-                    # Get severity level for this issue
-                    severity = violations_severity.get((idx, issue_type), "ERROR")
-                    row_copy["IssueLevel"] = severity
-                    expanded_rows.append(row_copy)
-            
-            # Create dataframe from expanded rows
-            report_df = pl.DataFrame(expanded_rows)
+        if violation_idxs:
+            # Typed up front so polars builds each column directly instead of inferring
+            violations_long = pl.DataFrame(
+                {
+                    "idx": violation_idxs,
+                    "IssueType": violation_types,
+                    "IssueLevel": violation_levels,
+                },
+                schema={
+                    "idx": df_original.schema["idx"],
+                    "IssueType": pl.Utf8,
+                    "IssueLevel": pl.Utf8,
+                },
+            )
+
+            # Join expands each trade row once per issue type it was flagged for.
+            # Repeated (idx, issue) entries are dropped on the narrow frame before
+            # the join, so the wide report never needs a full-row unique()
+            report_lf = (
+                df_original.lazy()
+                .join(violations_long.lazy().unique(), on="idx", how="inner")
+                .drop(["KeyEpoch", "ExitEpoch"])
+                .sort("idx")
+            )
             
-            # Write CSV to timestamped file in logs directory
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Write CSV to the logs directory
             output_file = os.path.join(output_dir, f"violations.csv")
             # output_file = os.path.join(f"violations_report.csv")
-            report_df = report_df.drop(["KeyEpoch", "ExitEpoch"])
-            report_df = report_df.unique().sort("idx")
 
             # import sys 
             # sys.exit()
-            report_df.write_csv(output_file)
+            _sink_csv(report_lf, output_file)
             # Count individual issue types (not combined ones)
-            issue_type_counts = {}
-            for idx, issue_list in violations_issues.items():
-                for issue_type in issue_list:
-                    issue_type = issue_type.upper()
-                    if issue_type not in issue_type_counts:
-                        issue_type_counts[issue_type] = 0
-                    issue_type_counts[issue_type] += 1
+            issue_type_counts = (
+                violations_long
+                .group_by(pl.col("IssueType").str.to_uppercase(), maintain_order=True)
+                .len()
+                .sort("len", descending=True, maintain_order=True)
+            )
             
             print(f"\n=== Violations Report Generated (Excluding Info Checks) ===")
             print(f"Output file: {output_file}")
@@ -343,10 +445,10 @@ def generate_violations_from_checks(results, df_original: pl.DataFrame, algo_nam
             print(f'ERRORS: {errors_count}')
             print(f'WARNINGS: {warnings_count}')
             # Sort by count descending
-            for issue_type, count in sorted(issue_type_counts.items(), key=lambda x: x[1], reverse=True):
+            for issue_type, count in issue_type_counts.iter_rows():
                 print(f"  {issue_type}: {count}")
             
-            return report_df
+            return output_file
         else:
             print(f"\n=== Violations Report Generated (Excluding Info Checks) ===")
             print("No violations found (excluding info checks).")
@@ -357,31 +459,23 @@ def generate_violations_from_checks(results, df_original: pl.DataFrame, algo_nam
         traceback.print_exc()
         return None
 
-def main(algo_name, trade_log_path, lot_size_file_path="lot_size.csv", segment="UNIVERSAL", ORB_URL=None, ORB_USERNAME=None, ORB_PASSWORD=None, output_path="logs"):
+def main(algo_name, trade_log_path, lot_size_file_path="lot_size.csv", segment="UNIVERSAL", ORB_URL=None, ORB_USERNAME=None, ORB_PASSWORD=None, output_path="logs", datetime_format=DATETIME_FORMAT):
     ALGO_NAME = algo_name
     TRADE_LOG = trade_log_path
     SEGMENT = segment.upper()
     LOT_SIZE_FILE = lot_size_file_path
     logger = Logger(algo_name=ALGO_NAME, log_dir=output_path)
-    sys.stdout = logger
     
     try:
-        results, violations, infos, df = build_and_run(trade_log=TRADE_LOG, segment=SEGMENT, lot_size_file=LOT_SIZE_FILE, ORB_USERNAME=ORB_USERNAME, ORB_PASSWORD=ORB_PASSWORD, ORB_URL=ORB_URL)
-        print_summary(results, violations, infos, skip_infos=False)
-        print("\n" + "="*80)
-        generate_violations_from_checks(results, df, algo_name=ALGO_NAME, output_dir=output_path)
+        # Restores whatever stdout was active before (not sys.__stdout__), even on error
+        with contextlib.redirect_stdout(logger):
+            results, violations, infos, df = build_and_run(trade_log=TRADE_LOG, segment=SEGMENT, lot_size_file=LOT_SIZE_FILE, ORB_USERNAME=ORB_USERNAME, ORB_PASSWORD=ORB_PASSWORD, ORB_URL=ORB_URL, datetime_format=datetime_format)
+            print_summary(results, violations, infos, skip_infos=False)
+            print("\n" + "="*80)
+            generate_violations_from_checks(results, df, algo_name=ALGO_NAME, output_dir=output_path)
     finally:
         logger.close()
-        sys.stdout = sys.__stdout__
         print("[OK] Validation complete. Log saved to: " + logger.log_file)
         
 if __name__ == "__main__":
-    import os
-    from dotenv import load_dotenv
-    from pymongo import MongoClient
-    load_dotenv()
-
-    mongo_uri = os.getenv('MONGO_URI')
-    client = MongoClient(mongo_uri)
-    main(algo_name="ALGO", trade_log_path="sample_trade_log_2024_updated.csv", lot_size_file_path="lot_size.csv", mongo_client=client, output_path=r"C:\Users\aryan\OneDrive\Desktop\WORK__\validator_final\trade_log_validator\millionaire")
-    
\ No newline at end of file
+    main(*sys.argv[1:])
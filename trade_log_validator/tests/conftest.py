@@ -5,11 +5,68 @@ import pytest
 import polars as pl
 import os
 import sys
+import types
+from functools import lru_cache
 
 # Add parent directory to path so tests can import modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+# Column dtypes of the baseline trade frame, given up front so nothing is inferred
+BASE_SCHEMA = {
+    "idx": pl.Int64,
+    "Key": pl.Utf8,
+    "ExitTime": pl.Utf8,
+    "Symbol": pl.Utf8,
+    "EntryPrice": pl.Float64,
+    "ExitPrice": pl.Float64,
+    "Quantity": pl.Float64,
+    "PositionStatus": pl.Float64,
+    "Pnl": pl.Float64,
+    "ExitType": pl.Utf8,
+    "KeyEpoch": pl.Int64,
+    "ExitEpoch": pl.Int64,
+    "ExitTag": pl.Utf8,
+    "ExpectedPnl": pl.Float64,
+}
+
+
+def _build_base_df(num_rows=5):
+    """Create a basic valid trade log DataFrame"""
+    return pl.DataFrame({
+        "idx": pl.int_range(num_rows, eager=True),
+        "Key": pl.repeat("01-01-2021 09:30", num_rows, eager=True),
+        "ExitTime": pl.repeat("01-01-2021 10:30", num_rows, eager=True),
+        "Symbol": pl.repeat("NIFTY", num_rows, eager=True),
+        "EntryPrice": pl.repeat(100.0, num_rows, eager=True),
+        "ExitPrice": pl.repeat(105.0, num_rows, eager=True),
+        "Quantity": pl.repeat(10.0, num_rows, eager=True),
+        "PositionStatus": pl.repeat(1.0, num_rows, eager=True),
+        "Pnl": pl.repeat(50.0, num_rows, eager=True),
+        "ExitType": pl.repeat("Target Hit", num_rows, eager=True),
+        "KeyEpoch": pl.repeat(1609472400000000, num_rows, eager=True),
+        "ExitEpoch": pl.repeat(1609476000000000, num_rows, eager=True),
+        "ExitTag": pl.repeat("+", num_rows, eager=True),
+        "ExpectedPnl": pl.repeat(50.0, num_rows, eager=True),
+    }, schema=BASE_SCHEMA)
+
+
+@pytest.fixture(scope="session")
+def base_df_factory():
+    """Session-wide builder returning one shared valid trade DataFrame per row count.
+
+    Polars frames are immutable, so tests derive variations with with_columns()
+    and never touch the cached template.
+    """
+    return lru_cache(maxsize=None)(_build_base_df)
+
+
+@pytest.fixture(scope="session")
+def base_df(base_df_factory):
+    """Fixture providing the default 5-row valid trade DataFrame"""
+    return base_df_factory(5)
+
+
 @pytest.fixture
 def sample_trade_df():
     """Fixture providing a sample valid trade DataFrame"""
@@ -60,3 +117,27 @@ def sample_chain_df():
         "sym": ["NIFTY", "NIFTY", "BANKNIFTY"],
         "c": [100.0, 105.0, 205.0],
     })
+
+
+@pytest.fixture
+def mock_orb(monkeypatch):
+    """Fixture serving the ORB API from an in-memory candles frame (ti, sym, c) instead of the network.
+
+    Call it with the candles; the chain check's `import requests` then gets a stub whose
+    find endpoint returns the candles matching each queried (sym, ti).
+    """
+    def install(candles):
+        def post(url, data=None, headers=None, json=None):
+            response = types.SimpleNamespace()
+            if url.endswith("/api/auth/token"):
+                response.json = lambda: {"access_token": "test-token"}
+                return response
+            wanted = {(q["sym"], q["ti"]) for q in json["query"]["$or"]}
+            rows = [r for r in candles.iter_rows(named=True) if (r["sym"], r["ti"]) in wanted]
+            response.json = lambda: {"data": rows}
+            return response
+
+        requests = types.ModuleType("requests")
+        requests.post = post
+        monkeypatch.setitem(sys.modules, "requests", requests)
+    return install
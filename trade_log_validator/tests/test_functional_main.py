@@ -0,0 +1,267 @@
+"""
+Tests for the pipeline in functional_main.py: CSV loading and caching, and the violations report
+"""
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import polars as pl
+
+import functional_main
+from result import CheckResult
+
+
+TRADE_LOG_CSV = (
+    "Key,ExitTime,Symbol,EntryPrice,ExitPrice,Quantity,PositionStatus,Pnl,ExitType\n"
+    "01-01-2021 09:30,01-01-2021 10:30,NIFTY,100.0,105.0,10,1,50.0,Target Hit\n"
+    "01-01-2021 11:00,01-01-2021 12:00,NIFTY,200.0,190.0,5,1,-50.0,Stoploss Hit\n"
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the parsed-CSV cache at a fresh directory for the test"""
+    path = str(tmp_path / "cache")
+    monkeypatch.setattr(functional_main, "CACHE_DIR", path)
+    return path
+
+
+@pytest.fixture
+def trade_log(tmp_path):
+    """A two-trade log on disk"""
+    path = tmp_path / "trades.csv"
+    path.write_text(TRADE_LOG_CSV)
+    return str(path)
+
+
+def _cache_files(cache_dir):
+    return sorted(os.listdir(cache_dir))
+
+
+def _ist_epoch_us(*wall_time):
+    """Epoch in microseconds of an IST wall time, as preprocessing derives KeyEpoch/ExitEpoch"""
+    utc = datetime(*wall_time) - timedelta(hours=5, minutes=30)
+    return int(utc.replace(tzinfo=timezone.utc).timestamp()) * 1_000_000
+
+
+def _write_log(tmp_path, times):
+    """Write a log with one trade per (Key, ExitTime) pair"""
+    path = tmp_path / "layouts.csv"
+    rows = "".join(f"{key},{exit_time},NIFTY,100.0,105.0,10,1,50.0,Target Hit\n" for key, exit_time in times)
+    path.write_text(TRADE_LOG_CSV.splitlines(keepends=True)[0] + rows)
+    return str(path)
+
+
+@pytest.fixture
+def run(cache_dir, mock_orb):
+    """build_and_run on a log, with the ORB API serving no candles"""
+    mock_orb(pl.DataFrame({"ti": [], "sym": [], "c": []}, schema={"ti": pl.Int64, "sym": pl.Utf8, "c": pl.Float64}))
+
+    def _run(path, **kwargs):
+        return functional_main.build_and_run(
+            trade_log=path, segment="UNIVERSAL", lot_size_file=None,
+            ORB_URL="http://orb.test", ORB_USERNAME="user", ORB_PASSWORD="pass", **kwargs,
+        )
+    return _run
+
+
+class TestLoadDfCache:
+    """Test cases for the Arrow IPC cache behind load_df"""
+
+    def test_cache_hit_reuses_arrow_file(self, cache_dir, trade_log):
+        """Test that a second load of an unchanged log reads the cache written by the first"""
+        first = functional_main.load_df(trade_log).collect()
+        [cached] = _cache_files(cache_dir)
+        assert cached.endswith(".arrow")
+        before = os.stat(os.path.join(cache_dir, cached))
+
+        second = functional_main.load_df(trade_log).collect()
+        after = os.stat(os.path.join(cache_dir, cached))
+        assert _cache_files(cache_dir) == [cached]
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+        assert second.equals(first)
+        assert first["Pnl"].to_list() == [50.0, -50.0]
+
+    def test_edited_log_invalidates_and_prunes_cache(self, cache_dir, trade_log):
+        """Test that editing the log rebuilds the cache and removes the stale file"""
+        functional_main.load_df(trade_log).collect()
+        [stale] = _cache_files(cache_dir)
+
+        with open(trade_log, "a") as f:
+            f.write("01-01-2021 13:00,01-01-2021 14:00,NIFTY,300.0,310.0,1,1,10.0,Target Hit\n")
+        df = functional_main.load_df(trade_log).collect()
+
+        [fresh] = _cache_files(cache_dir)
+        assert fresh != stale
+        assert df.height == 3
+
+    def test_concurrent_loads_share_one_cache_file(self, cache_dir, trade_log, capsys):
+        """Test that parallel first loads of one log neither fail nor leave temp files behind"""
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            frames = list(ex.map(lambda _: functional_main.load_df(trade_log).collect(), range(4)))
+
+        assert all(df.equals(frames[0]) for df in frames)
+        assert "Could not write" not in capsys.readouterr().out
+        [cached] = _cache_files(cache_dir)
+        assert cached.endswith(".arrow")
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions only")
+    def test_cache_is_private(self, cache_dir, trade_log):
+        """Test that the cache directory is 0700 and cached logs are 0600"""
+        functional_main.load_df(trade_log).collect()
+        [cached] = _cache_files(cache_dir)
+
+        assert stat.S_IMODE(os.stat(cache_dir).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(os.path.join(cache_dir, cached)).st_mode) == 0o600
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions only")
+    def test_shared_cache_dir_is_not_trusted(self, cache_dir, trade_log, capsys):
+        """Test that a cache directory open to other users is neither read nor written"""
+        os.makedirs(cache_dir)
+        os.chmod(cache_dir, 0o755)
+
+        df = functional_main.load_df(trade_log).collect()
+        assert df.height == 2
+        assert _cache_files(cache_dir) == []
+        assert "Not caching" in capsys.readouterr().out
+
+
+class TestViolationsFromChecks:
+    """Test cases for the join-based violations.csv in generate_violations_from_checks"""
+
+    @pytest.fixture
+    def trades(self):
+        return pl.DataFrame({
+            "idx": pl.Series([0, 1, 2], dtype=pl.UInt32),
+            "Symbol": ["NIFTY", "NIFTY", "BANKNIFTY"],
+            "Pnl": [50.0, None, 0.0],
+            "Strategy": ["S1", "S2", "S3"],
+            "KeyEpoch": [1, 2, 3],
+            "ExitEpoch": [4, 5, 6],
+        })
+
+    def test_one_report_row_per_issue(self, trades, tmp_path, capsys):
+        """Test that a trade flagged by several issues appears once per issue, repeats collapsed"""
+        header = ("idx", "Symbol", "Pnl")
+        results = [
+            CheckResult("No Nulls", "UNIVERSAL", "FAIL", "Nulls detected",
+                        {"NULLS": [header, (1, "NIFTY", None)]}, {"NULLS": "ERROR"}),
+            CheckResult("NON ZERO CHECKS", "UNIVERSAL", "FAIL", "Zero values detected",
+                        {"ZERO": [header, (2, "BANKNIFTY", 0.0), (2, "BANKNIFTY", 0.0)]}, {"ZERO": "WARNING"}),
+            CheckResult("PnL", "UNIVERSAL", "FAIL", "PnL mismatch",
+                        {"PNL": [header, (2, "BANKNIFTY", 0.0)]}, {"PNL": "ERROR"}),
+            CheckResult("No Negatives", "UNIVERSAL", "PASS", "No negatives found"),
+        ]
+
+        functional_main.generate_violations_from_checks(results, trades, "algo", output_dir=str(tmp_path))
+
+        report = pl.read_csv(tmp_path / "violations.csv").sort(["idx", "IssueType"])
+        assert report.columns == ["idx", "Symbol", "Pnl", "Strategy", "IssueType", "IssueLevel"]
+        assert report.select("idx", "IssueType", "IssueLevel").rows() == [
+            (1, "NULLS", "ERROR"),
+            (2, "PNL", "ERROR"),
+            (2, "ZERO", "WARNING"),
+        ]
+        assert report.filter(pl.col("idx") == 2)["Strategy"].to_list() == ["S3", "S3"]
+        assert "ERRORS: 2" in capsys.readouterr().out
+
+    def test_info_check_rows_stay_out_of_report(self, trades, tmp_path, capsys):
+        """Test that concurrent-position flags are printed but not written to violations.csv"""
+        results = [
+            CheckResult("check all concurrent positions", "UNIVERSAL", "FAIL", "Too many open trades",
+                        {"CONCURRENT": [("idx",), (0,)]}),
+        ]
+
+        functional_main.generate_violations_from_checks(results, trades, "algo", output_dir=str(tmp_path))
+
+        assert not (tmp_path / "violations.csv").exists()
+        assert "Row 0: check all concurrent positions: CONCURRENT" in capsys.readouterr().out
+
+    def test_report_is_streamed_to_disk(self, trades, tmp_path):
+        """Test that the report is written to violations.csv and its path returned"""
+        results = [
+            CheckResult("No Nulls", "UNIVERSAL", "FAIL", "Nulls detected",
+                        {"NULLS": [("idx",), (1,)]}, {"NULLS": "ERROR"}),
+        ]
+
+        out = functional_main.generate_violations_from_checks(results, trades, "algo", output_dir=str(tmp_path))
+
+        assert out == os.path.join(str(tmp_path), "violations.csv")
+        assert pl.read_csv(out)["idx"].to_list() == [1]
+
+
+class TestViolationsReport:
+    """Test cases for generate_violations_report"""
+
+    def test_report_columns_and_excluded_issues(self, tmp_path, capsys):
+        """Test that info issues are dropped and each violation gets an ID and description"""
+        violations = tmp_path / "violations.csv"
+        violations.write_text(
+            "Key,ExitTime,Symbol,EntryPrice,ExitPrice,Pnl,Quantity,IssueType\n"
+            "01-01-2021 09:30,01-01-2021 10:30,NIFTY,100.0,105.0,50.0,10,PNL mismatch\n"
+            "01-01-2021 09:30,01-01-2021 10:30,NIFTY,100.0,105.0,50.0,10,ConcurrentTradesExceeded\n"
+            "01-01-2021 11:00,01-01-2021 12:00,NIFTY,200.0,190.0,-50.0,5,NULLS\n"
+        )
+        output = tmp_path / "violations_report.csv"
+
+        out = functional_main.generate_violations_report(str(violations), str(output))
+
+        assert out == str(output)
+        report = pl.read_csv(output)
+        assert report.columns == [
+            "Trade_ID", "Key", "ExitTime", "Symbol", "EntryPrice", "ExitPrice",
+            "Pnl", "Quantity", "IssueType", "Description",
+        ]
+        assert report.select("Trade_ID", "IssueType").rows() == [(0, "PNL"), (1, "NULLS")]
+        assert report["Description"][0] == "PNL mismatch - Entry: 01-01-2021 09:30, Exit: 01-01-2021 10:30"
+        assert "ConcurrentTradesExceeded" not in capsys.readouterr().out
+
+
+class TestBuildAndRun:
+    """Test cases for the preprocessing behind build_and_run"""
+
+    def test_relative_path_after_chdir_is_another_log(self, run, tmp_path, monkeypatch):
+        """Test that a relative path reused from another directory is not served the first log's frame"""
+        for name, pnl in (("a", "50.0"), ("b", "60.0")):
+            (tmp_path / name).mkdir()
+            log = tmp_path / name / "trades.csv"
+            log.write_text(TRADE_LOG_CSV.replace("50.0,Target Hit", f"{pnl},Target Hit"))
+            os.utime(log, (1_600_000_000, 1_600_000_000))
+
+        monkeypatch.chdir(tmp_path / "a")
+        first = run("trades.csv")[3]
+        monkeypatch.chdir(tmp_path / "b")
+        second = run("trades.csv")[3]
+
+        assert first["Pnl"][0] == 50.0
+        assert second["Pnl"][0] == 60.0
+
+    def test_mixed_timestamp_layouts(self, run, tmp_path, capsys):
+        """Test that fallback layouts are parsed and only truly unparseable timestamps are warned about"""
+        log = _write_log(tmp_path, [
+            ("01-01-2021 09:30", "01-01-2021 10:30"),        # DATETIME_FORMAT
+            ("2021-01-01 11:00:00", "2021-01-01T12:00:00"),  # fallback layouts
+            ("not a time", "01-01-2021 13:00"),              # garbage Key
+        ])
+
+        df = run(log)[3]
+
+        assert df["KeyEpoch"].to_list() == [_ist_epoch_us(2021, 1, 1, 9, 30), _ist_epoch_us(2021, 1, 1, 11, 0), 0]
+        assert df["ExitEpoch"].to_list() == [
+            _ist_epoch_us(2021, 1, 1, 10, 30), _ist_epoch_us(2021, 1, 1, 12, 0), _ist_epoch_us(2021, 1, 1, 13, 0),
+        ]
+        assert "Warning: 1 trade(s) have a Key/ExitTime in an unrecognised layout" in capsys.readouterr().out
+
+    def test_datetime_format_is_configurable(self, run, tmp_path, capsys):
+        """Test that a per-algo datetime_format parses its layout, and the memo is keyed on it"""
+        log = _write_log(tmp_path, [("2021/01/01 09:30", "2021/01/01 10:30")])
+
+        df = run(log, datetime_format="%Y/%m/%d %H:%M")[3]
+        assert df["KeyEpoch"].to_list() == [_ist_epoch_us(2021, 1, 1, 9, 30)]
+        assert "unrecognised layout" not in capsys.readouterr().out
+
+        df = run(log)[3]
+        assert df["KeyEpoch"].to_list() == [0]
+        assert "Warning: 1 trade(s)" in capsys.readouterr().out
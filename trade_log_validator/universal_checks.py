@@ -1,5 +1,4 @@
 import polars as pl
-import pandas as pd
 prod = True
 if prod:
     from .result import CheckResult
@@ -8,6 +7,19 @@ else:
 import re 
 from datetime import datetime 
 
+# Default timestamp layout of Key/ExitTime in trade logs; algos that log differently pass datetime_format to validate()
+DATETIME_FORMAT = "%d-%m-%Y %H:%M"
+# Other layouts trade logs use; only tried for values DATETIME_FORMAT doesn't parse
+DATETIME_FALLBACK_FORMATS = ("%d-%m-%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M")
+# Expiry embedded in option symbols, ex: 21JAN21
+EXPIRY_FORMAT = "%d%b%y"
+
+# First entry of every issue list: names the fields of the row tuples that follow
+ISSUE_HEADER = ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
+                'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
+# pnl_check rows also carry the columns it derives
+PNL_ISSUE_HEADER = ISSUE_HEADER + ('ExitTag', 'ExpectedPnl')
+
 class Utils:
 
     # ---------- REGEX PATTERNS (FIXED) ----------
@@ -33,6 +45,10 @@ class Utils:
         r"(\d{2}[A-Z]{3}FUT|-(I|II|III))$"
     )
 
+    # Underlying of an option symbol: everything before the expiry (ex: NIFTY from NIFTY25FEB2119500CE).
+    # No lookahead, so .pattern also runs under polars' regex engine
+    UNDERLYING_PATTERN    = re.compile(r"^(.+?)\d{1,2}[A-Z]{3}\d{2}")
+
     @classmethod
     def get_db_name(cls, sym):
 
@@ -54,6 +70,11 @@ class Utils:
             else:
                 return "stock_db"    
 
+    @staticmethod
+    def parse_datetime(col, formats=(DATETIME_FORMAT,) + DATETIME_FALLBACK_FORMATS):
+        # First format that parses wins; null when none of them does
+        return pl.coalesce([pl.col(col).str.strptime(pl.Datetime("us"), fmt, strict=False) for fmt in formats])
+
     @classmethod
     def get_collection_name(cls, ti, fmt="%Y"):
         return datetime.fromtimestamp(ti).strftime(fmt)
@@ -62,17 +83,12 @@ class Utils:
 def no_nulls_check(df: pl.DataFrame) -> CheckResult:
     issues = {}
     result_name = f'Nulls'
-    issues[result_name] = [
-        ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-            'Quantity', 'PositionStatus', 'Pnl', 'ExitType')
-    ]
-
-    for col in df.columns:
-        if col in ['KeyEpoch', 'ExitEpoch']:
-            continue
-        rows = df.filter(pl.col(col).is_null()).rows()
-        for row in rows:
-            issues[result_name].append(row)
+    # Every column of the log is checked, so the rows (and header) carry all of them
+    issues[result_name] = [tuple(df.columns)]
+
+    # One pass over the frame: a row is flagged once, however many of its columns are null
+    cols = [c for c in df.columns if c not in ['KeyEpoch', 'ExitEpoch']]
+    issues[result_name].extend(df.filter(pl.any_horizontal([pl.col(c).is_null() for c in cols])).iter_rows())
 
     has_issues = any(len(v) > 1 for v in issues.values())
     if has_issues:
@@ -86,17 +102,9 @@ def non_zero_check(df: pl.DataFrame) -> CheckResult:
     cols = ['PositionStatus', 'Quantity', 'EntryPrice', 'ExitPrice', 'Pnl']
     issues = {}
     result_name = "Zeros" 
-    for col in cols:
-        issues[result_name] = [
-            ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-             'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
-        ]
-
-    for c in cols:
-        rows = df.filter(pl.col(c) == 0).rows()
-        if rows:
-            for row in rows:
-                issues[result_name].append(row)
+    issues[result_name] = [ISSUE_HEADER]
+
+    issues[result_name].extend(df.filter(pl.any_horizontal([pl.col(c) == 0 for c in cols])).iter_rows())
 
     has_issue = any(len(v) > 1 for v in issues.values())
     if has_issue:
@@ -110,16 +118,12 @@ def no_fractional_check(df: pl.DataFrame) -> CheckResult:
     cols = ['PositionStatus', 'Quantity']
     issues = {}
     result_name = 'Fractional Value'
-    issues[result_name] = [
-        ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-            'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
-    ]
+    issues[result_name] = [ISSUE_HEADER]
 
-    for c in cols:
-        rows = df.filter((pl.col(c) - pl.col(c).floor()) > 0).rows()
-        if rows:
-            for row in rows:
-                issues[result_name].append(row)
+    # One pass over the frame: a row is flagged once, however many of its columns are fractional
+    issues[result_name].extend(
+        df.filter(pl.any_horizontal([(pl.col(c) - pl.col(c).floor()) > 0 for c in cols])).iter_rows()
+    )
 
     has_issues = any(len(v) > 1 for v in issues.values())
     if has_issues:
@@ -132,16 +136,9 @@ def no_negatives_check(df: pl.DataFrame) -> CheckResult:
     cols=['Quantity','EntryPrice','ExitPrice']
     issues = {}
     result_name = 'Negatives'
-    issues[result_name] = [
-        ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-            'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
-    ]
+    issues[result_name] = [ISSUE_HEADER]
 
-    for c in cols:
-        rows = df.filter(pl.col(c) < 0).rows()
-        if rows:
-            for row in rows:
-                issues[result_name].append(row)
+    issues[result_name].extend(df.filter(pl.any_horizontal([pl.col(c) < 0 for c in cols])).iter_rows())
 
     has_issues = any(len(v) > 1 for v in issues.values())
     if has_issues:
@@ -154,53 +151,44 @@ def no_negatives_check(df: pl.DataFrame) -> CheckResult:
 def exit_after_entry_check(df: pl.DataFrame) -> CheckResult:
     result_name = "Exit < Entry"
     issues = {
-        result_name: [
-            ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-             'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
-        ]
+        result_name: [ISSUE_HEADER]
     }
-    rows = df.filter(pl.col("ExitEpoch") < pl.col("KeyEpoch")).rows()
+    issues[result_name].extend(df.filter(pl.col("ExitEpoch") < pl.col("KeyEpoch")).iter_rows())
 
-    if rows:
-        for row in rows:
-            issues[result_name].append(row)
+    if len(issues[result_name]) > 1:
         severity = {result_name: "ERROR"}
         return CheckResult("EXIT TI > ENTRY", "UNIVERSAL", "FAIL", "Exit before entry detected", issues, severity)
 
     return CheckResult("EXIT TI > ENTRY", "UNIVERSAL", "PASS", "All trades have valid entry/exit ordering")
 
 
-def market_hours_check(df: pl.DataFrame) -> CheckResult:
-    df2 = df.with_columns(
-        pl.col("Key").str.to_datetime(strict=False),
-        pl.col("ExitTime").str.to_datetime(strict=False)
-    )
+def market_hours_check(df: pl.DataFrame, parsed: pl.DataFrame = None) -> CheckResult:
+    # parsed: KeyDT/ExitDT already parsed by the caller, row-aligned with df
+    if parsed is None:
+        parsed = df.select(
+            Utils.parse_datetime("Key").alias("KeyDT"),
+            Utils.parse_datetime("ExitTime").alias("ExitDT"),
+        )
     issues = {}
     result_name = "OUTSIDE MARKET HOURS"
     # keys = ["Entry before Market Hours", "Exit after Market Hours", "Entry before Market Hours", "Exit after Market Hours"]
     # for key in keys:
-    issues[result_name] = [
-        ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-            'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
-    ]
-
-    entry_early = df2.filter(pl.col("Key").dt.time() < pl.time(9, 15)).rows()
-    entry_late = df2.filter(pl.col("Key").dt.time() > pl.time(15, 25)).rows()
-    exit_early = df2.filter(pl.col("ExitTime").dt.time() < pl.time(9, 15)).rows()
-    exit_late = df2.filter(pl.col("ExitTime").dt.time() > pl.time(15, 25)).rows()
-
-    if entry_early:
-        for row in entry_early:
-            issues[result_name].append(row)
-    if exit_early:
-        for row in exit_early:
-            issues[result_name].append(row)
-    if entry_late:
-        for row in entry_late:
-            issues[result_name].append(row)
-    if exit_late:
-        for row in exit_late:
-            issues[result_name].append(row)
+    issues[result_name] = [ISSUE_HEADER]
+
+    # Time of day taken once per column, then a single filter over all four bounds
+    outside = (
+        (pl.col("_entry_t") < pl.time(9, 15)) | (pl.col("_entry_t") > pl.time(15, 25))
+        | (pl.col("_exit_t") < pl.time(9, 15)) | (pl.col("_exit_t") > pl.time(15, 25))
+    )
+    flagged = (
+        df.with_columns(
+            parsed.get_column("KeyDT").dt.time().alias("_entry_t"),
+            parsed.get_column("ExitDT").dt.time().alias("_exit_t"),
+        )
+        .filter(outside)
+        .drop(["_entry_t", "_exit_t"])
+    )
+    issues[result_name].extend(flagged.iter_rows())
 
     has_issues = any(len(v) > 1 for v in issues.values())
     if has_issues:
@@ -214,25 +202,32 @@ def pnl_check(df: pl.DataFrame) -> CheckResult:
     result_name = ["PnL", "Pnl"]
     issues = {}
     for res in result_name:
-        issues[res] = [('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice', 'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch', 'ExitTag', 'ExpectedPnl')]
+        issues[res] = [PNL_ISSUE_HEADER]
             
 
     df2 = df.with_columns([
-        pl.when(pl.col("ExitType").str.contains("Target")).then(pl.lit("+") )
-        .when(pl.col("ExitType").str.contains("Stoploss")).then(pl.lit("-")).otherwise(pl.lit("")).alias("ExitTag"),
+        pl.when(pl.col("ExitType").str.contains("Target", literal=True)).then(pl.lit("+") )
+        .when(pl.col("ExitType").str.contains("Stoploss", literal=True)).then(pl.lit("-")).otherwise(pl.lit("")).alias("ExitTag"),
         ((pl.col('Quantity') * (pl.col('ExitPrice') - pl.col('EntryPrice'))) * pl.col('PositionStatus')).alias('ExpectedPnl')
     ])
 
-    pnl_mismatch_rows = df2.filter(pl.col('ExpectedPnl') - pl.col('Pnl') > 1e-4).rows()
-    reason_mismatch_rows = df2.filter(
+    # Both rules in one scan; the two trailing flags say which bucket(s) each row goes to
+    pnl_mismatch = pl.col('ExpectedPnl') - pl.col('Pnl') > 1e-4
+    reason_mismatch = (
         ((pl.col('ExitTag') == '+') & (pl.col('Pnl') < 0))
         | ((pl.col('ExitTag') == '-') & (pl.col('Pnl') > 0))
-    ).rows()
+    )
+    flagged = (
+        df2
+        .with_columns(pnl_mismatch.alias('_pnl'), reason_mismatch.alias('_reason'))
+        .filter(pl.col('_pnl') | pl.col('_reason'))
+    )
 
-    for row in pnl_mismatch_rows:
-        issues['Pnl'].append(row)
-    for row in reason_mismatch_rows:
-        issues['PnL'].append(row)
+    for *row, is_pnl, is_reason in flagged.iter_rows():
+        if is_pnl:
+            issues['Pnl'].append(tuple(row))
+        if is_reason:
+            issues['PnL'].append(tuple(row))
 
     has_issues = any(len(v) > 1 for v in issues.values())
     if has_issues:
@@ -247,22 +242,20 @@ def pnl_check(df: pl.DataFrame) -> CheckResult:
 
 def entry_exit_price_chain_check(df: pl.DataFrame, ORB_URL, ORB_USERNAME, ORB_PASSWORD) -> CheckResult:
     def generate_queries(df):
-        queries = {}    
-        for idx, row in df.iterrows():
-            for col in ['KeyEpoch', 'ExitEpoch']:
-                try:
-                    db = Utils.get_db_name(sym=row['Symbol'])
-                    import math
-                    val = row[col]
-                    if not math.isnan(val): 
-                        ti = int((val / 1e6) - 60)
-                        collection = Utils.get_collection_name(ti=ti)
-                        queries.setdefault(db, {}).setdefault(collection, [])
-                        queries[db][collection].append({"sym": row["Symbol"], "ti": ti})
-                    else:
-                        continue
-                except:
-                    continue
+        # Each distinct (sym, ti) is queried once, and the db is resolved once per symbol
+        queries = {}
+        pairs = pl.concat([
+            df.select(pl.col("Symbol").alias("sym"), pl.col(col).alias("ti"))
+            for col in ['EntryTi', 'ExitTi']
+        ]).unique(maintain_order=True).drop_nulls()  # trades without a Symbol end up NOT_FOUND
+        db_names = {}
+        for sym, ti in pairs.iter_rows():
+            if sym not in db_names:
+                db_names[sym] = Utils.get_db_name(sym=sym)
+            db = db_names[sym]
+            collection = Utils.get_collection_name(ti=ti)
+            queries.setdefault(db, {}).setdefault(collection, [])
+            queries[db][collection].append({"sym": sym, "ti": ti})
         return queries
     
     def _get_price(queries, ORB_URL, ORB_USERNAME, ORB_PASSWORD):
@@ -297,9 +290,9 @@ def entry_exit_price_chain_check(df: pl.DataFrame, ORB_URL, ORB_USERNAME, ORB_PA
                 all_rows.extend(data)
                 
         if not all_rows:
-            return pd.DataFrame().set_index(["ti", "sym"])
+            return pl.DataFrame(schema={"ti": pl.Int64, "sym": pl.Utf8, "c": pl.Float64})
 
-        df = pd.DataFrame(all_rows)
+        df = pl.DataFrame(all_rows, infer_schema_length=None)
 
         if "ti" not in df.columns or "sym" not in df.columns:
             print("hi")
@@ -308,65 +301,56 @@ def entry_exit_price_chain_check(df: pl.DataFrame, ORB_URL, ORB_USERNAME, ORB_PA
             print(data)
             raise ValueError("Response missing required columns: ti, sym")
             
-        df = df.set_index(["ti", "sym"]).sort_index()
         return df
         
-    pdf = df.to_pandas()
     result_name = ["LTP", "NOT_FOUND"]
     issues = {}
     for res in result_name:
-        issues[res] = [('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice', 'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')]
-    queries = generate_queries(df=pdf)
+        issues[res] = [ISSUE_HEADER]
+    # Candle starting a minute before entry/exit; NaN/null epochs become null here
+    df2 = df.with_columns(
+        ((pl.col("KeyEpoch") / 1e6) - 60).cast(pl.Int64, strict=False).alias("EntryTi"),
+        ((pl.col("ExitEpoch") / 1e6) - 60).cast(pl.Int64, strict=False).alias("ExitTi"),
+    )
+    # Trades without a usable epoch can't be priced: report them up front and query the rest.
+    # Preprocessing fills unparseable timestamps with epoch 0, which lands before 1970 here
+    bad_epoch = (
+        pl.col("EntryTi").is_null() | pl.col("ExitTi").is_null()
+        | (pl.col("EntryTi") < 0) | (pl.col("ExitTi") < 0)
+    )
+    issues[result_name[0]].extend(df2.filter(bad_epoch).select(df.columns).iter_rows())
+    df2 = df2.filter(~bad_epoch)
+    queries = generate_queries(df=df2)
     # print(queries)
-    res_df = _get_price(queries=queries, ORB_URL=ORB_URL, ORB_USERNAME=ORB_USERNAME, ORB_PASSWORD=ORB_PASSWORD)
-    # res_df.to_csv('RES.csv')
-    for idx, row in pdf.iterrows():
-        # Handle NaN values in KeyEpoch and ExitEpoch
-        try:
-            key_epoch = row["KeyEpoch"]
-            exit_epoch = row["ExitEpoch"]
-            
-            # Skip rows with NaN values
-            if pd.isna(key_epoch) or pd.isna(exit_epoch):
-                issues[result_name[0]].append(row)
-                continue
-            
-            entry_time = int((key_epoch / 1e6) - 60)
-            exit_time = int((exit_epoch / 1e6) - 60)
-        except (ValueError, TypeError) as e:
-            # If we can't convert epoch times, mark as issue and skip
-            issues[result_name[0]].append(row)
-            continue
-        sym = row["Symbol"]
-        try:
-            entry = res_df.loc[(entry_time, sym)]["c"]
-            exitp = res_df.loc[(exit_time, sym)]["c"]
-        except:
-            issues[result_name[1]].append(row)
-        entry_price = float(row['EntryPrice'])
-        exit_price = float(row['ExitPrice'])
-        # print(entry, exitp)
-        # import sys 
-        # sys.exit()
-        
-        if entry is None or (float(entry) != entry_price) or (exitp is None or float(exitp) != exit_price):
-            # print("h", sym)
+    chain_df = _get_price(queries=queries, ORB_URL=ORB_URL, ORB_USERNAME=ORB_USERNAME, ORB_PASSWORD=ORB_PASSWORD)
+    # One candle per (ti, sym), so the joins below never fan a trade out
+    chain_df = chain_df.select(
+        pl.col("ti").cast(pl.Int64),
+        pl.col("sym").cast(pl.Utf8),
+        pl.col("c").cast(pl.Float64),
+    ).unique(subset=["ti", "sym"], keep="first")
+
+    joined = (
+        df2.lazy()
+        .join(chain_df.lazy().rename({"ti": "EntryTi", "sym": "Symbol", "c": "ChainEntry"}),
+              on=["EntryTi", "Symbol"], how="left", maintain_order="left")
+        .join(chain_df.lazy().rename({"ti": "ExitTi", "sym": "Symbol", "c": "ChainExit"}),
+              on=["ExitTi", "Symbol"], how="left", maintain_order="left")
+    )
+
+    not_found = pl.col("ChainEntry").is_null() | pl.col("ChainExit").is_null()
+    mismatch = ~not_found & (
+        (pl.col("ChainEntry") != pl.col("EntryPrice")) | (pl.col("ChainExit") != pl.col("ExitPrice"))
+    )
+
+    # Both buckets collected together, so the shared joins are only computed once
+    ltp_rows, missing_rows = pl.collect_all([
+        joined.filter(mismatch).select(df.columns),
+        joined.filter(not_found).select(df.columns),
+    ])
+    issues[result_name[0]].extend(ltp_rows.iter_rows())
+    issues[result_name[1]].extend(missing_rows.iter_rows())
 
-            # print(entry, exitp, entry_price, exit_price)
-            # print(row['Key'], entry_time, int((key_epoch / 1e6)))
-            # print(row['ExitTime'], exit_time, int((exit_epoch / 1e6)))
-            issues[result_name[0]].append(row)
-    
-    # print(queries)
-        # print(entry_time, row['Symbol'], exit_time)
-    # import sys    
-    # sys.exit()
-    
-    
-            
-            
-        
-        
     has_issues = any(len(v) > 1 for v in issues.values())
     if has_issues:
         severity = {result_name[0]: "ERROR", result_name[1]: "ERROR"}
@@ -374,28 +358,23 @@ def entry_exit_price_chain_check(df: pl.DataFrame, ORB_URL, ORB_USERNAME, ORB_PA
 
     return CheckResult("LTP VALIDATION", "UNIVERSAL", "PASS", "Entry/Exit chain prices consistent")
 
-def options_expiry_check(df: pl.DataFrame)->CheckResult:
+def options_expiry_check(df: pl.DataFrame, parsed: pl.DataFrame = None)->CheckResult:
+    # parsed: ExpiryDT already parsed by the caller, row-aligned with df
+    if parsed is None:
+        parsed = df.select(
+            pl.col("Symbol").str.slice(5, 7).str.strptime(pl.Date, EXPIRY_FORMAT, strict=False).alias("ExpiryDT")
+        )
     result_name = "Exit After Expiry"
     issues = {
-        result_name: [
-            ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-            'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
-        ]
+        result_name: [ISSUE_HEADER]
     }
-    df = df.with_columns(
-        pl.col("Symbol").str.slice(5, 7).alias("Expiry"),
-    )
-    df = df.with_columns(
-        pl.col("Expiry").str.strptime(pl.Date, "%d%b%y", strict=False).add(pl.duration(days=1)).alias("Expiry"),        
-        pl.col("ExitEpoch").cast(pl.Datetime)
+    after_expiry = pl.col("ExitEpoch").cast(pl.Datetime) > pl.col("_expiry").add(pl.duration(days=1))
+    flagged = (
+        df.with_columns(parsed.get_column("ExpiryDT").alias("_expiry"))
+        .filter(after_expiry)
+        .drop("_expiry")
     )
-    
-
-    rows = df.filter(
-        pl.col("ExitEpoch") > pl.col("Expiry")
-    ).rows()
-    for row in rows:
-        issues[result_name].append(row) 
+    issues[result_name].extend(flagged.iter_rows())
     has_issues = any(len(v) > 1 for k, v in issues.items())
     if has_issues:
         severity = {"Exit After Expiry": "ERROR"}
@@ -414,38 +393,37 @@ def options_expiry_check(df: pl.DataFrame)->CheckResult:
             "Exit After expiry"
             )
 
-import re
-
 def extract_symbol(sym):
-    pattern = r"(.+?)(?=\d{1,2}[A-Z]{3}\d{2})"
-    match = re.match(pattern, sym)
+    match = Utils.UNDERLYING_PATTERN.match(sym)
     return match.group(1) if match else None
 
 def options_quantity_check(df: pl.DataFrame, lot_size_df)->CheckResult:
     result_name = ["QTY", "SYMBOL"]
     issues = {}
     for res in result_name:
-        issues[res] = [
-                ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-                'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
-            ]
-
-    pdf = df.to_pandas()
-    for idx, row in pdf.iterrows():
-        try:
-            sym = extract_symbol(row["Symbol"])
-        except Exception as e:
-            print(e)
-            print(f"ERROR RETRIEVING SYMBOL {idx}, {sym}")
-        # print(sym)
-        else:
-            size = lot_size_df.filter(pl.col('Symbol') == sym)["LotSize"]
-            if len(size) > 0:
-                size = size[0]
-                if size != row["Quantity"]:
-                    issues["QTY"].append(row)    
-            else:
-                issues["SYMBOL"].append(row)
+        issues[res] = [ISSUE_HEADER]
+
+    # Same underlying as extract_symbol(), for every row in one sweep
+    df2 = df.with_columns(
+        pl.col("Symbol").str.extract(Utils.UNDERLYING_PATTERN.pattern, 1).alias("Underlying")
+    )
+    # First lot size listed per symbol wins; LotFound tells a missing symbol from a null lot size
+    lots = (
+        lot_size_df
+        .select(pl.col("Symbol").alias("Underlying"), pl.col("LotSize"))
+        .unique(subset="Underlying", keep="first", maintain_order=True)
+        .with_columns(pl.lit(True).alias("LotFound"))
+    )
+    joined = df2.lazy().join(lots.lazy(), on="Underlying", how="left", maintain_order="left")
+
+    # Rows without a Symbol are left to no_nulls_check
+    has_symbol = pl.col("Symbol").is_not_null()
+    qty_rows, symbol_rows = pl.collect_all([
+        joined.filter(pl.col("LotFound") & pl.col("LotSize").ne_missing(pl.col("Quantity"))).select(df.columns),
+        joined.filter(has_symbol & pl.col("LotFound").is_null()).select(df.columns),
+    ])
+    issues["QTY"].extend(qty_rows.iter_rows())
+    issues["SYMBOL"].extend(symbol_rows.iter_rows())
                 
     has_issues = any(len(v)  > 1 for k, v in issues.items())
     if has_issues:
@@ -459,29 +437,16 @@ def options_quantity_check(df: pl.DataFrame, lot_size_df)->CheckResult:
 def duplicate_rows_check(df: pl.DataFrame) -> CheckResult:
     result_name = "DUPLICATES"
 
+    # Trades are compared on every column of the log, so the rows (and header) carry all of them
     issues = {
-        result_name: [
-            ('idx', 'Key', 'ExitTime', 'Symbol', 'EntryPrice', 'ExitPrice',
-             'Quantity', 'PositionStatus', 'Pnl', 'ExitType', 'KeyEpoch', 'ExitEpoch')
-        ]
+        result_name: [tuple(df.columns)]
     }
 
     # ---- CRITICAL FIX: remove idx column when checking ----
-    dup_cols = [c for c in df.columns if c != "idx"]
-
-    dup_df = (
-        df
-        .group_by(dup_cols)
-        .agg(pl.count().alias("cnt"))
-        .filter(pl.col("cnt") > 1)
-        .drop("cnt")
-    )
-
-    # Join back to get original rows including idx
-    dup_rows_df = df.join(dup_df, on=dup_cols, how="inner")
+    # One hash pass over the remaining columns marks every copy of a repeated trade
+    dup_mask = df.drop("idx").is_duplicated()
 
-    for row in dup_rows_df.rows():
-        issues[result_name].append(row)
+    issues[result_name].extend(df.filter(dup_mask).iter_rows())
 
     has_issues = len(issues[result_name]) > 1
 
@@ -7,32 +7,24 @@ else:
     from result import CheckResult
 
 def pnl_distribution(df: pl.DataFrame) -> CheckResult:
-    pnl  = df['Pnl'].to_numpy()
+    pnl = pl.col("Pnl")
+    mean, max_, min_ = df.select(pnl.mean().alias("mean"), pnl.max().alias("max"), pnl.min().alias("min")).row(0)
     output = {
-        "mean": f'Rs.{pnl.mean():.4f}',
-        "max": f'Rs.{pnl.max():.4f}',
-        "min": f'Rs.{pnl.min():.4f}'
+        "mean": f'Rs.{mean:.4f}',
+        "max": f'Rs.{max_:.4f}',
+        "min": f'Rs.{min_:.4f}'
     }
     return CheckResult("PnL ", "UNIVERSAL", "FETCHED INFO", "Pnl Distribution", output)
 
 
 def trade_duration(df: pl.DataFrame) -> CheckResult:
-    df2 = df.with_columns([
-        pl.col("KeyEpoch").cast(pl.Int64),
-        pl.col("ExitEpoch").cast(pl.Int64),
-
-        pl.col("KeyEpoch").cast(pl.Datetime("us")).alias("EntryDT"),
-        pl.col("ExitEpoch").cast(pl.Datetime("us")).alias("ExitDT"),
-    ])
-
-    df2 = df2.with_columns(
-        (pl.col("ExitDT") - pl.col("EntryDT")).dt.total_seconds().alias("DurationSec")
-    )
-    durations = df2["DurationSec"].to_numpy() / 86400  
+    # Epochs are in microseconds; all three stats come out of one select
+    days = (pl.col("ExitEpoch") - pl.col("KeyEpoch")) / 1e6 / 86400
+    mean, max_, min_ = df.select(days.mean().alias("mean"), days.max().alias("max"), days.min().alias("min")).row(0)
     output = {
-        "mean": f'{durations.mean():.4f} DAYS',
-        "max": f'{durations.max():.4f} DAYS',
-        "min": f'{durations.min():.4f} DAYS'
+        "mean": f'{mean:.4f} DAYS',
+        "max": f'{max_:.4f} DAYS',
+        "min": f'{min_:.4f} DAYS'
     }
 
     return CheckResult("Trades duration (DAYS)", "UNIVERSAL", "FETCHED INFO", "Trade Duration", output)
@@ -41,18 +33,13 @@ def trade_duration(df: pl.DataFrame) -> CheckResult:
 def concurrent_positions(df: pl.DataFrame) -> CheckResult:
     entry_col = "KeyEpoch"
     exit_col = "ExitEpoch"
-    df2 = df.with_columns([
-        pl.col(entry_col).cast(pl.Int64),
-        pl.col(exit_col).cast(pl.Int64),
-
-        pl.col(entry_col).cast(pl.Datetime("us")).alias("EntryDT"),
-        pl.col(exit_col).cast(pl.Datetime("us")).alias("ExitDT"),
-        pl.lit(1).alias("delta")
-    ])
+    # Epochs sort the same as their datetimes, so the events stay plain integers;
+    # Int8 is enough for +1/-1 and cum_sum widens it to Int64
+    entries = df.select(pl.col(entry_col).cast(pl.Int64).alias("ts"), pl.lit(1, dtype=pl.Int8).alias("delta"))
+    exits = df.select(pl.col(exit_col).cast(pl.Int64).alias("ts"), pl.lit(-1, dtype=pl.Int8).alias("delta"))
 
     events = (
-        df2.select([pl.col("EntryDT").alias("ts"), pl.col("delta")])
-        .vstack(df2.select([pl.col("ExitDT").alias("ts"), -pl.col("delta")]))
+        pl.concat([entries, exits])
         .sort("ts")
         .with_columns(pl.col("delta").cum_sum().alias("ConcurrentTrades"))
     )